@@ -1,19 +1,41 @@
 import argparse
 import redis
 import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 class DataStore:
-    def __init__(self, host='localhost', port=6379, db=0):
-        self.r = redis.Redis(host=host, port=port, db=db)
+    # Not every platform exposes all of these (e.g. no TCP_KEEPIDLE on macOS)
+    KEEPALIVE_OPTIONS = {
+        getattr(socket, name): value
+        for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 30), ('TCP_KEEPCNT', 3))
+        if hasattr(socket, name)
+    }
 
-    def add_domain(self, project, domain):
-        return self.r.sadd(project, domain)
+    def __init__(self, host='localhost', port=6379, db=0, max_connections=8, unix_socket_path=None):
+        # Sized to the ingestion worker count; workers block instead of failing
+        # when every connection is busy
+        if unix_socket_path:
+            # A local Redis over a Unix socket skips the TCP loopback stack
+            pool = redis.BlockingConnectionPool(connection_class=redis.UnixDomainSocketConnection,
+                                                path=unix_socket_path, db=db,
+                                                max_connections=max_connections, timeout=10)
+        else:
+            # redis-py sets TCP_NODELAY on every TCP connection, so batched SADDs aren't held back by Nagle
+            pool = redis.BlockingConnectionPool(host=host, port=port, db=db, socket_keepalive=True,
+                                                socket_keepalive_options=self.KEEPALIVE_OPTIONS,
+                                                max_connections=max_connections, timeout=10)
+        self.r = redis.Redis(connection_pool=pool)
 
-    def get_domains(self, project):
-        return self.r.smembers(project)
+    def add_domains(self, project, domains):
+        if not domains:
+            return 0
+        return self.r.sadd(project, *domains)  # SADD is variadic, one round-trip per batch
 
-    def deduplicate(self, project):
-        pass
+    def iter_domains(self, project, count=10000):
+        # SSCAN streams the set in slices instead of one huge SMEMBERS reply
+        return self.r.sscan_iter(project, count=count)
 
     def delete_project(self, project):
         return self.r.delete(project)
@@ -25,23 +47,46 @@ class DataStore:
         return self.r.scard(project)  # SCARD command returns the set count
 
 class Project:
+    BATCH_SIZE = 10000  # ~2.5 MB per SADD at worst, far below Redis' bulk limit
+    WORKERS = 8
+
     def __init__(self, datastore, name):
         self.datastore = datastore
         self.name = name
+        self.key = name.encode('utf-8')  # Encoded once; redis-py passes bytes keys through as-is
 
     def add_domains_from_file(self, filename):
         if not os.path.exists(filename):
             print("File {} does not exist.".format(filename))
             return
-        with open(filename, 'r') as file:
+        with open(filename, 'rb', buffering=1 << 18) as file:  # 256 KiB read buffer
             total_domains = 0
             new_domains = 0
-            for line in file:
-                domain = line.strip()
-                if domain:  # Check if the domain is not empty
-                    added = self.datastore.add_domain(self.name, domain)
-                    new_domains += added
-                total_domains += 1 if domain else 0  # Only count non-empty lines as total domains
+            batch = []
+            pending = set()
+            seen = set()  # Repeats within the file never need to reach Redis
+            repeated = 0
+            with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+                for line in self._read_lines(file):
+                    domain = line.strip()
+                    if not domain:  # Skip empty lines
+                        continue
+                    if domain in seen:
+                        repeated += 1
+                    else:
+                        seen.add(domain)
+                        batch.append(domain)
+                        if len(batch) >= self.BATCH_SIZE:
+                            # Bound the batches in flight so reading can't race ahead of Redis
+                            if len(pending) >= 2 * self.WORKERS:
+                                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                                new_domains += sum(future.result() for future in done)
+                            pending.add(executor.submit(self.datastore.add_domains, self.key, batch))
+                            total_domains += len(batch)  # Only non-empty lines ever reach a batch
+                            batch = []
+                pending.add(executor.submit(self.datastore.add_domains, self.key, batch))
+                total_domains += len(batch) + repeated
+                new_domains += sum(future.result() for future in pending)
             duplicate_domains = total_domains - new_domains
             if total_domains > 0:
                 duplicate_percentage = (duplicate_domains / total_domains) * 100
@@ -49,22 +94,33 @@ class Project:
                 duplicate_percentage = 0
             print("{} out of {} domains were duplicates ({:.2f}%).".format(duplicate_domains, total_domains, duplicate_percentage))
 
+    def _read_lines(self, file):
+        # Split 1 MiB blocks ourselves; the partial last line carries over to the next block
+        tail = b''
+        while True:
+            block = file.read(1 << 20)
+            if not block:
+                break
+            lines = (tail + block).split(b'\n')
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
     def get_domains(self):
-        return self.datastore.get_domains(self.name)
+        return self.datastore.iter_domains(self.key)
     
     def count_domains(self):
-        if not self.datastore.project_exists(self.name):
+        count = self.datastore.count_domains(self.key)
+        # SCARD returns 0 for a missing key, so only then check whether the project exists
+        if count == 0 and not self.datastore.project_exists(self.key):
             print(f"Error: Project '{self.name}' does not exist.")
             return
-        count = self.datastore.count_domains(self.name)
         print(f"There are {count} domains in the project '{self.name}'.")
 
-    def deduplicate(self):
-        self.datastore.deduplicate(self.name)
-    
     def delete(self):
         print(f"Attempting to delete project '{self.name}'...")
-        deleted_count = self.datastore.delete_project(self.name)
+        deleted_count = self.datastore.delete_project(self.key)
         if deleted_count == 0:
             print(f"No such project '{self.name}' to delete.")
         else:
@@ -75,9 +131,10 @@ def main():
     parser.add_argument('-p', '--project', required=True, help='The project name')
     parser.add_argument('-f', '--file', help='The file containing domains')
     parser.add_argument('-o', '--operation', required=True, choices=['add', 'print', 'delete', 'count'], help='Operation to perform')
+    parser.add_argument('-s', '--socket', help='Path to a local Redis Unix socket (e.g. /var/run/redis/redis.sock)')
     args = parser.parse_args()
 
-    datastore = DataStore()
+    datastore = DataStore(max_connections=Project.WORKERS, unix_socket_path=args.socket)
     project = Project(datastore, args.project)
 
     def add_operation():
@@ -85,12 +142,13 @@ def main():
             print("You must provide a file with the 'add' operation.")
             return
         project.add_domains_from_file(args.file)
-        project.deduplicate()
 
     def print_operation():
-        domains = project.get_domains()
-        for domain in domains:
-            print(domain.decode('utf-8'))
+        # Redis hands back bytes; write them through without a decode/encode round-trip
+        out = sys.stdout.buffer
+        for domain in project.get_domains():
+            out.write(domain + b'\n')
+        out.flush()
 
     def delete_operation():
         print("Attempting to delete project...")